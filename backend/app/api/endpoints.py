@@ -1,10 +1,12 @@
 #app/api/endpoints.py
-from fastapi import APIRouter, UploadFile, File, HTTPException, Form
+from fastapi import APIRouter, UploadFile, File, HTTPException, Form, Header
 from app.services.file_processor import process_file
 from app.services.storage_handler import get_processed_file
+from app.utils.profiling import PROFILING_ENABLED, PROFILING_HEADER, is_authorized, list_profiles, read_profile
+from fastapi.responses import Response
 import logging
 from pydantic import BaseModel
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -79,6 +81,27 @@ async def delete_project(project_id: str):
     # Implement logic to delete a project
     return {"message": f"Project {project_id} deleted"}
 
+def check_profiling_access(token: Optional[str]):
+    if not PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    if not is_authorized(token):
+        raise HTTPException(status_code=403, detail="Invalid profiling token")
+
+@router.get("/admin/profiles")
+async def get_profiles(token: Optional[str] = Header(None, alias=PROFILING_HEADER)):
+    check_profiling_access(token)
+    return {"profiles": list_profiles()}
+
+@router.get("/admin/profiles/{name}")
+async def download_profile(name: str, token: Optional[str] = Header(None, alias=PROFILING_HEADER)):
+    check_profiling_access(token)
+    content = read_profile(name)
+    if content is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    media_type = "text/plain" if name.endswith(".txt") else "application/octet-stream"
+    return Response(content, media_type=media_type,
+                    headers={"Content-Disposition": f'attachment; filename="{name}"'})
+
 @router.get("/health")
 async def health_check():
     return {"status": "healthy"}
\ No newline at end of file
@@ -1,6 +1,7 @@
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi import FastAPI
 from .api.endpoints import router as api_router
+from .utils.profiling import ProfilingMiddleware, PROFILING_ENABLED
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -13,6 +14,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allows all methods
     allow_headers=["*"],  # Allows all headers
+    expose_headers=["X-Profile-Id"],
 )
 
+# Opt-in request profiling, see app/utils/profiling.py
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
 app.include_router(api_router, prefix="/api/v1")
\ No newline at end of file
@@ -1,13 +1,26 @@
 from docx import Document
 import re
 import io
-from typing import List, Dict, Any, Optional, Union, Tuple
+from typing import List, Dict, Any, Optional, Union, Tuple, Iterable
 import logging
 import uuid
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Speaker patterns, tried in order
+SPEAKER_PATTERNS = [
+    re.compile(r'\*\*(.*?)\*\*:?\s*(\d{2}:\d{2})?\s*'),  # **Speaker Name** 00:00
+    re.compile(r'(说话人\d+)\s*(\d{2}:\d{2})?\s*'),       # 说话人1 00:00
+    re.compile(r'^([^:]+?):\s*(\d{2}:\d{2})?\s*')         # Speaker: 00:00
+]
+TIMESTAMP_PATTERN = re.compile(r'(\d{2}):(\d{2})')
+MARKDOWN_PATTERN = re.compile(r'\*\*|\*')
+CLEAN_TIMESTAMP_PATTERN = re.compile(r'\d{2}:\d{2}(?::\d{2})?\s*')
+
+# Seconds assumed for a segment when the next timestamp is unknown
+DEFAULT_SEGMENT_DURATION = 30.0
+
 def is_chinese_char(char: str) -> bool:
     """Check if a character is Chinese"""
     return '\u4e00' <= char <= '\u9fff'
@@ -36,7 +49,7 @@ def extract_timestamp(text: str) -> Optional[float]:
     Extract MM:SS format timestamp and convert to seconds
     Returns None if no valid timestamp found
     """
-    timestamp_match = re.search(r'(\d{2}):(\d{2})', text)
+    timestamp_match = TIMESTAMP_PATTERN.search(text)
     if timestamp_match:
         minutes = int(timestamp_match.group(1))
         seconds = int(timestamp_match.group(2))
@@ -49,23 +62,16 @@ def extract_timestamp(text: str) -> Optional[float]:
 def clean_text(text: str) -> str:
     """Remove markdown-style formatting and clean text"""
     # Remove ** markers
-    text = re.sub(r'\*\*|\*', '', text)
+    text = MARKDOWN_PATTERN.sub('', text)
     # Remove timestamps
-    text = re.sub(r'\d{2}:\d{2}(?::\d{2})?\s*', '', text)
+    text = CLEAN_TIMESTAMP_PATTERN.sub('', text)
     # Clean extra whitespace
     return ' '.join(text.split()).strip()
 
 def parse_segment(text: str) -> Tuple[Optional[str], str, Optional[float]]:
     """Parse a segment of text to extract speaker and content"""
-    # Match speaker patterns
-    speaker_patterns = [
-        r'\*\*(.*?)\*\*:?\s*(\d{2}:\d{2})?\s*',  # **Speaker Name** 00:00
-        r'(说话人\d+)\s*(\d{2}:\d{2})?\s*',       # 说话人1 00:00
-        r'^([^:]+?):\s*(\d{2}:\d{2})?\s*'         # Speaker: 00:00
-    ]
-    
-    for pattern in speaker_patterns:
-        match = re.match(pattern, text)
+    for pattern in SPEAKER_PATTERNS:
+        match = pattern.match(text)
         if match:
             speaker = match.group(1).strip()
             timestamp = match.group(2) if len(match.groups()) > 1 else None
@@ -83,73 +89,96 @@ def parse_segment(text: str) -> Tuple[Optional[str], str, Optional[float]]:
             
     return None, text.strip(), None
 
+def build_segments(lines: Iterable[str], default_speaker: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Group lines of transcript text into schema segments.
+    Lines starting with a speaker (and optional MM:SS timestamp) open a new
+    segment; other lines are appended to the current one. Text before the
+    first speaker line is dropped unless a default_speaker is given.
+    """
+    segments = []
+    current_segment = None
+    text_parts = []  # Joined with single spaces once the segment is complete, so text has no leading space
+    segment_index = 1
+    last_time = 0.0  # Track the last known timestamp
+    
+    def new_segment(speaker: str, start_time: float, cleaned_text: str) -> Dict[str, Any]:
+        return {
+            "index": segment_index,
+            "start_time": start_time,
+            "end_time": None,  # Will be set later
+            "text": cleaned_text,
+            "speaker": speaker,
+            "words": [{"start": -1, "end": -1, "word": word} for word in split_into_words(cleaned_text)]
+        }
+    
+    def close_segment(end_time: float):
+        current_segment["end_time"] = end_time
+        current_segment["text"] = " ".join(text_parts)
+        segments.append(current_segment)
+    
+    for line in lines:
+        text = line.strip()
+        if not text:
+            continue
+            
+        speaker, content, start_time = parse_segment(text)
+        
+        if speaker:
+            # Save previous segment if it exists
+            if current_segment:
+                # If we have a new start_time, use it for previous segment's end_time
+                if start_time is not None:
+                    close_segment(start_time)
+                else:
+                    # If no new timestamp, estimate end_time based on last known time
+                    close_segment(current_segment["start_time"] + DEFAULT_SEGMENT_DURATION)
+            
+            # Update last_time if we have a valid start_time
+            if start_time is not None:
+                last_time = start_time
+            else:
+                # If no timestamp provided, estimate based on last known time
+                start_time = last_time + DEFAULT_SEGMENT_DURATION
+                last_time = start_time
+            
+            # Clean the content and create new segment
+            cleaned_text = clean_text(content)
+            current_segment = new_segment(speaker, start_time, cleaned_text)
+            text_parts = [cleaned_text] if cleaned_text else []
+            segment_index += 1
+        elif current_segment:
+            # Append text to current segment
+            cleaned_text = clean_text(text)
+            if cleaned_text:
+                text_parts.append(cleaned_text)
+                current_segment["words"].extend([
+                    {"start": -1, "end": -1, "word": word}
+                    for word in split_into_words(cleaned_text)
+                ])
+        elif default_speaker:
+            # Text before any speaker line starts a segment for the default speaker
+            cleaned_text = clean_text(text)
+            if cleaned_text:
+                current_segment = new_segment(default_speaker, last_time, cleaned_text)
+                text_parts = [cleaned_text]
+                segment_index += 1
+    
+    # Add the last segment
+    if current_segment:
+        # For the last segment, add a reasonable duration
+        close_segment(current_segment["start_time"] + DEFAULT_SEGMENT_DURATION)
+    
+    return segments
+
 async def parse_to_schema(content: bytes) -> Dict[str, Any]:
     """Parse DOCX content to transcript segments"""
     try:
         doc_stream = io.BytesIO(content)
         doc = Document(doc_stream)
         
-        segments = []
-        current_segment = None
-        segment_index = 1
-        last_time = 0.0  # Track the last known timestamp
-        
-        for para in doc.paragraphs:
-            text = para.text.strip()
-            if not text:
-                continue
-                
-            speaker, content, start_time = parse_segment(text)
-            
-            if speaker:
-                # Save previous segment if it exists
-                if current_segment:
-                    # If we have a new start_time, use it for previous segment's end_time
-                    if start_time is not None:
-                        current_segment["end_time"] = start_time
-                    else:
-                        # If no new timestamp, estimate end_time based on last known time
-                        current_segment["end_time"] = current_segment["start_time"] + 30.0
-                    segments.append(current_segment)
-                
-                # Update last_time if we have a valid start_time
-                if start_time is not None:
-                    last_time = start_time
-                else:
-                    # If no timestamp provided, estimate based on last known time
-                    start_time = last_time + 30.0
-                    last_time = start_time
-                
-                # Clean the content and split into words
-                cleaned_text = clean_text(content)
-                words = split_into_words(cleaned_text)
-                
-                # Create new segment
-                current_segment = {
-                    "index": segment_index,
-                    "start_time": start_time,
-                    "end_time": None,  # Will be set later
-                    "text": cleaned_text,
-                    "speaker": speaker,
-                    "words": [{"start": -1, "end": -1, "word": word} for word in words]
-                }
-                segment_index += 1
-            elif current_segment:
-                # Append text to current segment
-                cleaned_text = clean_text(text)
-                if cleaned_text:
-                    current_segment["text"] += " " + cleaned_text
-                    words = split_into_words(cleaned_text)
-                    current_segment["words"].extend([
-                        {"start": -1, "end": -1, "word": word}
-                        for word in words
-                    ])
-        
-        # Add the last segment
-        if current_segment:
-            # For the last segment, add a reasonable duration
-            current_segment["end_time"] = current_segment["start_time"] + 30.0
-            segments.append(current_segment)
+        paragraphs = (para.text for para in doc.paragraphs)
+        segments = build_segments(paragraphs)
         
         # Calculate total duration safely
         if segments:
@@ -0,0 +1,183 @@
+import asyncio
+import io
+import multiprocessing
+import os
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from itertools import chain
+from typing import List, Dict, Any, Optional, Union, Tuple
+import logging
+from pypdf import PdfReader, apply_configuration
+from pypdf.errors import LimitReachedError
+from app.services.file_handlers.docx_handler import build_segments
+from app.utils.profiling import profile_executor_call
+
+logger = logging.getLogger(__name__)
+
+# Documents with at least this many pages are extracted in a process pool
+PARALLEL_PAGE_THRESHOLD = int(os.getenv("PDF_PARALLEL_PAGE_THRESHOLD", "64"))
+PDF_MAX_WORKERS = int(os.getenv("PDF_MAX_WORKERS", str(min(os.cpu_count() or 1, 8))))
+# Decompressed-size limit for each stream pypdf decodes while extracting a page;
+# pages that hit it are skipped
+MAX_STREAM_BYTES = int(os.getenv("PDF_MAX_STREAM_BYTES", str(8 * 1024 * 1024)))
+# Output-size cap: extracted text beyond this many characters per page is dropped
+MAX_PAGE_CHARS = int(os.getenv("PDF_MAX_PAGE_CHARS", "200000"))
+# Speaker for text that appears before the first speaker line
+DEFAULT_SPEAKER = "UNKNOWN-1"
+
+# One pool shared by all requests, so concurrent uploads queue for the same workers
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+def stream_limits() -> Dict[str, int]:
+    """pypdf Configuration overrides capping the output of each stream decoder"""
+    return {
+        "zlib_maximum_output_length": MAX_STREAM_BYTES,
+        "lzw_maximum_output_length": MAX_STREAM_BYTES,
+        "run_length_maximum_output_length": MAX_STREAM_BYTES,
+        "brotli_maximum_output_length": MAX_STREAM_BYTES,
+        "array_based_stream_maximum_output_length": MAX_STREAM_BYTES,
+    }
+
+def extract_page_text(reader: PdfReader, page_number: int) -> str:
+    """
+    Extract the text of one page. pypdf stops decoding any stream that would
+    decompress past MAX_STREAM_BYTES, and such pages are skipped. The result
+    is capped at MAX_PAGE_CHARS.
+    """
+    try:
+        # pypdf's configuration is a context variable, so it is applied per call in every worker
+        with apply_configuration(**stream_limits()):
+            text = reader.pages[page_number].extract_text() or ''
+    except LimitReachedError as e:
+        logger.warning(f"Skipping page {page_number + 1}: {str(e)}")
+        return ''
+
+    if len(text) > MAX_PAGE_CHARS:
+        logger.warning(f"Page {page_number + 1} has {len(text)} characters, truncating to {MAX_PAGE_CHARS}")
+        text = text[:MAX_PAGE_CHARS]
+    return text
+
+def extract_page_range(path: str, start: int, end: int) -> List[str]:
+    """
+    Extract pages [start, end) in a pool worker. Each range uses a fresh reader
+    so objects parsed for earlier ranges are released.
+    """
+    reader = PdfReader(path)
+    return [extract_page_text(reader, page_number) for page_number in range(start, end)]
+
+def split_page_ranges(page_count: int, chunks: int) -> List[Tuple[int, int]]:
+    """Split pages into contiguous ranges, one per chunk"""
+    chunk_size = -(-page_count // chunks)
+    return [(start, min(start + chunk_size, page_count)) for start in range(0, page_count, chunk_size)]
+
+def get_pool(max_workers: int) -> ProcessPoolExecutor:
+    """
+    Return the shared extraction pool, creating it on first use. Workers are
+    started with forkserver (spawn where unavailable) rather than forking the
+    threaded server process.
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None and _pool_workers != max_workers:
+            _pool.shutdown(wait=True)
+            _pool = None
+        if _pool is None:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+            _pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=context)
+            _pool_workers = max_workers
+        return _pool
+
+def discard_pool(pool: ProcessPoolExecutor):
+    """Drop a broken pool so the next get_pool() starts fresh workers"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
+
+def extract_pages(content: bytes, max_workers: Optional[int] = None) -> List[str]:
+    """Extract text from every page, in page order"""
+    if max_workers is None:
+        max_workers = PDF_MAX_WORKERS
+
+    reader = PdfReader(io.BytesIO(content))
+    page_count = len(reader.pages)
+    logger.info(f"PDF has {page_count} pages")
+
+    if page_count < PARALLEL_PAGE_THRESHOLD or max_workers <= 1:
+        return [extract_page_text(reader, page_number) for page_number in range(page_count)]
+
+    # Several ranges per worker so a slow range doesn't leave the other workers idle
+    ranges = split_page_ranges(page_count, max_workers * 4)
+    logger.info(f"Extracting {page_count} pages in {len(ranges)} ranges with {max_workers} workers")
+
+    # Workers read the document from a temporary file instead of receiving the bytes with every task
+    with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as file:
+        file.write(content)
+    try:
+        starts, ends = zip(*ranges)
+        for attempt in range(2):
+            pool = get_pool(max_workers)
+            try:
+                results = pool.map(extract_page_range, [file.name] * len(ranges), starts, ends)
+                return list(chain.from_iterable(results))
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM-killed); replace the shared pool so later uploads aren't stuck
+                discard_pool(pool)
+                if attempt:
+                    raise
+                logger.warning("PDF extraction pool broke, retrying with a fresh pool")
+    finally:
+        os.remove(file.name)
+
+async def parse(content: Union[str, bytes]) -> Dict[str, Any]:
+    logger.info("Starting PDF parsing")
+
+    if isinstance(content, str):
+        # If content is a file path, read the file
+        with open(content, 'rb') as file:
+            content = file.read()
+
+    try:
+        # Extraction is CPU bound, keep it off the event loop
+        loop = asyncio.get_running_loop()
+        pages = await loop.run_in_executor(None, profile_executor_call(extract_pages), content)
+    except Exception as e:
+        logger.error(f"Error extracting PDF text: {str(e)}")
+        raise ValueError(f"Error extracting PDF text: {str(e)}")
+
+    lines = chain.from_iterable(page.splitlines() for page in pages)
+    segments = build_segments(lines, default_speaker=DEFAULT_SPEAKER)
+
+    total_duration = max((seg["end_time"] for seg in segments), default=0.0)
+
+    parsed_data = {
+        "project_id": str(uuid.uuid4()),
+        "media": {
+            "id": str(uuid.uuid4()),
+            "source": "document.pdf",
+            "duration": total_duration,
+            "uploaded_on": datetime.utcnow().isoformat() + "Z"
+        },
+        "transcript": {
+            "segments": segments
+        },
+        "edits": []
+    }
+
+    logger.info(f"Parsed {len(segments)} segments from {len(pages)} PDF pages")
+    return parsed_data
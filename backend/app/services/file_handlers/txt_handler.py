@@ -1,3 +1,74 @@
-async def parse(content):
-    lines = content.decode().split('\n')
-    return [{"text": line.strip()} for line in lines if line.strip()]
\ No newline at end of file
+import codecs
+import io
+import uuid
+from datetime import datetime
+from typing import List, Dict, Any, Union
+import logging
+from app.services.file_handlers.docx_handler import build_segments
+
+logger = logging.getLogger(__name__)
+
+# Bytes inspected when guessing the encoding of a file without a BOM
+ENCODING_SNIFF_BYTES = 64 * 1024
+# Speaker for text that appears before the first speaker line
+DEFAULT_SPEAKER = "UNKNOWN-1"
+
+def detect_encoding(content: bytes) -> str:
+    """
+    Guess the text encoding from the BOM or a prefix of the content.
+    Falls back to GB18030 (a superset of GBK/GB2312) when the prefix is not UTF-8;
+    parse() also retries with GB18030 if the rest of the file is not UTF-8.
+    """
+    if content.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if content.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+
+    try:
+        # Incremental decoder tolerates a multi-byte character cut off at the end of the sample
+        codecs.getincrementaldecoder('utf-8')().decode(content[:ENCODING_SNIFF_BYTES], final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'gb18030'
+
+def parse_lines(content: bytes, encoding: str, errors: str) -> List[Dict[str, Any]]:
+    """Decode line by line instead of materialising the whole decoded text"""
+    stream = io.TextIOWrapper(io.BytesIO(content), encoding=encoding, errors=errors)
+    return build_segments(stream, default_speaker=DEFAULT_SPEAKER)
+
+async def parse(content: Union[str, bytes]) -> Dict[str, Any]:
+    logger.info("Starting TXT parsing")
+
+    if isinstance(content, str):
+        # If content is a file path, read the file
+        with open(content, 'rb') as file:
+            content = file.read()
+
+    encoding = detect_encoding(content)
+    logger.info(f"Detected TXT encoding: {encoding}")
+
+    try:
+        segments = parse_lines(content, encoding, errors='strict')
+    except UnicodeDecodeError as e:
+        # Only the sniffed prefix was valid, e.g. an ASCII header over GB18030 text
+        logger.warning(f"TXT is not valid {encoding} ({str(e)}), decoding as gb18030")
+        segments = parse_lines(content, 'gb18030', errors='replace')
+
+    total_duration = max((seg["end_time"] for seg in segments), default=0.0)
+
+    parsed_data = {
+        "project_id": str(uuid.uuid4()),
+        "media": {
+            "id": str(uuid.uuid4()),
+            "source": "document.txt",
+            "duration": total_duration,
+            "uploaded_on": datetime.utcnow().isoformat() + "Z"
+        },
+        "transcript": {
+            "segments": segments
+        },
+        "edits": []
+    }
+
+    logger.info(f"Parsed {len(segments)} segments from TXT")
+    return parsed_data
@@ -1,6 +1,7 @@
 from fastapi import UploadFile, HTTPException
-from app.services.file_handlers import image_handler, docx_handler, txt_handler, json_handler,srt_handler,srtx_handler
+from app.services.file_handlers import docx_handler, txt_handler, json_handler,srt_handler,srtx_handler,pdf_handler
 from app.services.storage_handler import save_uploaded_file, save_processed_file
+from app.utils.profiling import trace_allocations
 from datetime import datetime
 import uuid
 import logging
@@ -20,28 +21,28 @@ async def process_file(file: UploadFile, user_id: str):
         with open(original_path, 'rb') as f:
             file_content = f.read()
         
-        if file.filename.endswith('.txt'):
-            logger.info("Using TXT parser")
-            parsed = await txt_handler.parse(file_content)
-        elif file.filename.endswith('.docx'):
-            logger.info("Using DOCX parser")
-            parsed = await docx_handler.parse_to_schema(file_content)
-        elif file.filename.endswith('.pdf'):
-            logger.info("Using PDF parser")
-            parsed = await image_handler.parse(file_content)
-        elif file.filename.endswith('.json'):
-            logger.info("Using JSON parser")
-            parsed = await json_handler.parse(file_content)
-        elif file.filename.endswith('.srtx'):
-            logger.info("Using SRTX parser")
-            parsed = await srtx_handler.parse(file_content)
-        elif file.filename.endswith('.srt'):
-            logger.info("Using SRT parser")
-            parsed = await srt_handler.parse_srt(file_content)
-        else:
-            logger.error(f"Unsupported file type: {file.filename}")
-            raise ValueError(f"Unsupported file type: {file.filename}")
-
+        with trace_allocations("parse"):
+            if file.filename.endswith('.txt'):
+                logger.info("Using TXT parser")
+                parsed = await txt_handler.parse(file_content)
+            elif file.filename.endswith('.docx'):
+                logger.info("Using DOCX parser")
+                parsed = await docx_handler.parse_to_schema(file_content)
+            elif file.filename.endswith('.pdf'):
+                logger.info("Using PDF parser")
+                parsed = await pdf_handler.parse(file_content)
+            elif file.filename.endswith('.json'):
+                logger.info("Using JSON parser")
+                parsed = await json_handler.parse(file_content)
+            elif file.filename.endswith('.srtx'):
+                logger.info("Using SRTX parser")
+                parsed = await srtx_handler.parse(file_content)
+            elif file.filename.endswith('.srt'):
+                logger.info("Using SRT parser")
+                parsed = await srt_handler.parse_srt(file_content)
+            else:
+                logger.error(f"Unsupported file type: {file.filename}")
+                raise ValueError(f"Unsupported file type: {file.filename}")
 
         logger.info(f"Parsed content: {parsed}")
         result = create_project_structure(parsed, file.filename, file_id)
@@ -0,0 +1,236 @@
+# app/utils/profiling.py
+"""
+Opt-in request profiling.
+
+Disabled unless PROFILING_ENABLED is set. When enabled, a sample of requests
+(PROFILING_SAMPLE_RATE) and every request whose PROFILING_HEADER header matches
+PROFILING_TOKEN are run under cProfile, and the parse stage of `process_file`
+records a tracemalloc diff. Results are written to PROFILING_DIR, pruned to the
+newest PROFILING_MAX_FILES files, and served by the /admin/profiles endpoints,
+which require the same token.
+
+cProfile only hooks the event-loop thread, so a request profile also contains
+any other coroutines that ran on the loop while it was in flight, and misses
+work sent to executors. Wrap executor callables with `profile_executor_call`
+to record that work as a separate profile for the same request.
+"""
+import cProfile
+import contextvars
+import functools
+import hmac
+import io
+import logging
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+logger = logging.getLogger(__name__)
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0.0"))
+PROFILING_HEADER = os.getenv("PROFILING_HEADER", "X-Debug-Profile")
+# Shared secret for the debug header and admin endpoints; both are refused while unset
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+# Oldest files in PROFILING_DIR are deleted beyond this count
+PROFILING_MAX_FILES = int(os.getenv("PROFILING_MAX_FILES", "200"))
+PROFILING_DIR = os.getenv("PROFILING_DIR", "profiles")
+PROFILING_TOP_STATS = int(os.getenv("PROFILING_TOP_STATS", "40"))
+
+PROFILE_NAME_PATTERN = re.compile(r'^[\w.-]+\.(prof|txt)$')
+ADMIN_PATH_PATTERN = re.compile(r'/admin/profiles(/|$)')
+
+# Id of the profile being recorded for the current request, None otherwise
+_current_profile: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "current_profile", default=None
+)
+# cProfile and tracemalloc are process-wide, so only one request is profiled at a time
+_profile_lock = threading.Lock()
+
+
+def ensure_profiling_dir():
+    if not os.path.exists(PROFILING_DIR):
+        os.makedirs(PROFILING_DIR)
+
+
+def prune_profiles():
+    """Delete the oldest profile files so at most PROFILING_MAX_FILES remain"""
+    if not os.path.exists(PROFILING_DIR):
+        return
+    paths = [os.path.join(PROFILING_DIR, name) for name in os.listdir(PROFILING_DIR)
+             if PROFILE_NAME_PATTERN.match(name)]
+    if len(paths) <= PROFILING_MAX_FILES:
+        return
+    paths.sort(key=os.path.getmtime)
+    for path in paths[:len(paths) - PROFILING_MAX_FILES]:
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+
+
+def is_authorized(token: Optional[str]) -> bool:
+    """Check a client-supplied token against PROFILING_TOKEN"""
+    if not PROFILING_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode(), PROFILING_TOKEN.encode())
+
+
+def should_profile(request: Request) -> bool:
+    """Decide whether a request is profiled: debug header first, then random sampling"""
+    # Admin calls share the token; profiling them would write, and prune, the files being read
+    if ADMIN_PATH_PATTERN.search(request.url.path):
+        return False
+    if is_authorized(request.headers.get(PROFILING_HEADER)):
+        return True
+    return PROFILING_SAMPLE_RATE > 0 and random.random() < PROFILING_SAMPLE_RATE
+
+
+def new_profile_id(request: Request) -> str:
+    path = re.sub(r'[^\w-]+', '_', request.url.path).strip('_')
+    return f"{time.strftime('%Y%m%d-%H%M%S')}_{path}_{uuid.uuid4().hex[:8]}"
+
+
+def write_cprofile(profile_id: str, profiler: cProfile.Profile):
+    """Save raw stats (.prof, loadable with pstats/snakeviz) and a cumulative-time summary (.txt)"""
+    ensure_profiling_dir()
+    prof_path = os.path.join(PROFILING_DIR, f"{profile_id}.prof")
+    profiler.dump_stats(prof_path)
+
+    summary = io.StringIO()
+    stats = pstats.Stats(profiler, stream=summary)
+    stats.sort_stats("cumulative").print_stats(PROFILING_TOP_STATS)
+    with open(os.path.join(PROFILING_DIR, f"{profile_id}.txt"), "w") as f:
+        f.write(summary.getvalue())
+
+    logger.info(f"Saved cProfile output to {prof_path}")
+    prune_profiles()
+
+
+class ProfilingMiddleware(BaseHTTPMiddleware):
+    """
+    Run selected requests under cProfile and report the profile id in the
+    X-Profile-Id response header. Requests that arrive while another one is
+    being profiled are served normally, though their coroutines still show up
+    in the active profile.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        if not should_profile(request) or not _profile_lock.acquire(blocking=False):
+            return await call_next(request)
+
+        profile_id = new_profile_id(request)
+        token = _current_profile.set(profile_id)
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            try:
+                response = await call_next(request)
+            finally:
+                profiler.disable()
+            write_cprofile(profile_id, profiler)
+        finally:
+            _current_profile.reset(token)
+            _profile_lock.release()
+
+        response.headers["X-Profile-Id"] = profile_id
+        return response
+
+
+@contextmanager
+def trace_allocations(stage: str):
+    """
+    Record a tracemalloc snapshot diff around a block when the current request
+    is being profiled. A no-op otherwise.
+    """
+    profile_id = _current_profile.get()
+    if profile_id is None:
+        yield
+        return
+
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    try:
+        yield
+    finally:
+        after = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if started_tracing:
+            tracemalloc.stop()
+
+        ensure_profiling_dir()
+        path = os.path.join(PROFILING_DIR, f"{profile_id}_{stage}_tracemalloc.txt")
+        with open(path, "w") as f:
+            f.write(f"Stage: {stage}\n")
+            f.write(f"Traced memory: current={current / 1024:.1f} KiB, peak={peak / 1024:.1f} KiB\n\n")
+            for stat in after.compare_to(before, "lineno")[:PROFILING_TOP_STATS]:
+                f.write(f"{stat}\n")
+        logger.info(f"Saved tracemalloc diff for {stage} to {path}")
+        prune_profiles()
+
+
+def profile_executor_call(func: Callable) -> Callable:
+    """
+    Wrap a callable passed to `run_in_executor` so it is profiled on the
+    executor thread when the submitting request is being profiled. Must be
+    called on the request's side, since executors don't inherit context.
+    Work done in child processes is still not captured.
+    """
+    profile_id = _current_profile.get()
+    if profile_id is None:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+ allows only one active cProfile per process
+            logger.warning(f"Could not profile {func.__name__}: another profiler is active")
+            return func(*args, **kwargs)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.disable()
+            write_cprofile(f"{profile_id}_{func.__name__}", profiler)
+
+    return wrapper
+
+
+def list_profiles() -> List[Dict[str, Any]]:
+    if not os.path.exists(PROFILING_DIR):
+        return []
+
+    profiles = []
+    for name in sorted(os.listdir(PROFILING_DIR), reverse=True):
+        if not PROFILE_NAME_PATTERN.match(name):
+            continue
+        stat = os.stat(os.path.join(PROFILING_DIR, name))
+        profiles.append({"name": name, "size": stat.st_size, "created": stat.st_mtime})
+    return profiles
+
+
+def read_profile(name: str) -> Optional[bytes]:
+    """
+    Read a profile file by name, rejecting anything outside PROFILING_DIR.
+    The contents are read up front so pruning can't delete the file mid-download.
+    """
+    if not PROFILE_NAME_PATTERN.match(name):
+        return None
+    try:
+        with open(os.path.join(PROFILING_DIR, name), "rb") as f:
+            return f.read()
+    except (FileNotFoundError, IsADirectoryError):
+        return None
@@ -0,0 +1,393 @@
+# benchmarks/loadtest.py
+"""
+HTTP load test for the transcript processing API.
+
+Starts `app.main:app` under uvicorn in a scratch directory, replays a weighted
+mix of /upload, /multiple_uploads and /processed requests built from generated
+SRTX/JSON transcripts, and writes latency percentiles, throughput and server
+RSS to a JSON file.
+
+Usage (from the backend directory):
+    python benchmarks/loadtest.py --concurrency 16 --requests 2000 --workers 2
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+USER_ID = "loadtest_user"
+SPEAKERS = ["Speaker 1", "Speaker 2", "Interviewer", "说话人1"]
+WORDS = ["the", "project", "timeline", "we", "should", "cut", "this", "part",
+         "interview", "camera", "moment", "really", "good", "take", "again",
+         "我们", "今天", "讨论"]
+
+
+def format_srt_time(seconds: float) -> str:
+    """Convert seconds to SRT time format"""
+    ms = int(round(seconds * 1000))
+    hours, ms = divmod(ms, 3600000)
+    minutes, ms = divmod(ms, 60000)
+    secs, ms = divmod(ms, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d},{ms:03d}"
+
+
+def generate_sentence(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 24)))
+
+
+def generate_srtx(segment_count: int, rng: random.Random) -> bytes:
+    blocks = []
+    start = 0.0
+    for index in range(1, segment_count + 1):
+        end = start + rng.uniform(1.5, 8.0)
+        blocks.append(
+            f"{index}\n{format_srt_time(start)} --> {format_srt_time(end)}\n"
+            f"{rng.choice(SPEAKERS)}\n{generate_sentence(rng)}"
+        )
+        start = end
+    return "\n\n".join(blocks).encode("utf-8")
+
+
+def generate_json(segment_count: int, rng: random.Random) -> bytes:
+    transcription = []
+    start = 0.0
+    for _ in range(segment_count):
+        text = generate_sentence(rng)
+        words = []
+        word_start = start
+        for word in text.split():
+            words.append({"start": word_start, "end": word_start + 0.3, "word": word})
+            word_start += 0.35
+        transcription.append({
+            "segment": {"start": start, "end": word_start, "text": text,
+                        "speaker": rng.choice(SPEAKERS)},
+            "words": words,
+        })
+        start = word_start
+    return json.dumps({"transcription": transcription}).encode("utf-8")
+
+
+def build_corpus(sizes: List[int], seed: int) -> List[Tuple[str, bytes]]:
+    """Generate one SRTX and one JSON transcript per requested segment count"""
+    rng = random.Random(seed)
+    corpus = []
+    for size in sizes:
+        corpus.append((f"corpus_{size}.srtx", generate_srtx(size, rng)))
+        corpus.append((f"corpus_{size}.json", generate_json(size, rng)))
+    return corpus
+
+
+def parse_mix(mix: str) -> Dict[str, int]:
+    """Parse a weight spec such as 'upload=6,multiple=1,fetch=3'"""
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ("upload", "multiple", "fetch"):
+            raise ValueError(f"Unknown request type in mix: {name}")
+        weights[name] = int(weight)
+    if not any(weights.values()):
+        raise ValueError("Request mix must contain at least one non-zero weight")
+    return weights
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def process_tree_rss(pid: int) -> int:
+    """Return the summed RSS in bytes of a process and its children (Linux only)"""
+    pids = [pid]
+    children_path = f"/proc/{pid}/task/{pid}/children"
+    if os.path.exists(children_path):
+        with open(children_path) as f:
+            pids.extend(int(child) for child in f.read().split())
+
+    total = 0
+    for child_pid in pids:
+        try:
+            with open(f"/proc/{child_pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except OSError:
+            continue
+    return total
+
+
+class RssSampler(threading.Thread):
+    """Periodically samples the server's RSS in the background"""
+
+    def __init__(self, pid: int, interval: float = 0.25):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.samples: List[int] = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            rss = process_tree_rss(self.pid)
+            if rss:
+                self.samples.append(rss)
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        if not self.samples:
+            return {"start_mb": None, "peak_mb": None, "end_mb": None}
+        to_mb = 1024 * 1024
+        return {
+            "start_mb": round(self.samples[0] / to_mb, 1),
+            "peak_mb": round(max(self.samples) / to_mb, 1),
+            "end_mb": round(self.samples[-1] / to_mb, 1),
+        }
+
+
+def start_server(port: int, workers: int, workdir: str) -> subprocess.Popen:
+    """Run uvicorn from a scratch directory so uploads/ and processed/ stay out of the repo"""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = BACKEND_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    command = [sys.executable, "-m", "uvicorn", "app.main:app",
+               "--host", "127.0.0.1", "--port", str(port),
+               "--workers", str(workers), "--log-level", "warning"]
+    return subprocess.Popen(command, cwd=workdir, env=env)
+
+
+def wait_for_server(base_url: str, server: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with code {server.returncode}")
+        try:
+            if requests.get(f"{base_url}/api/v1/health", timeout=1).ok:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server did not become healthy within {timeout} seconds")
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    rank = (len(sorted_values) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    values = sorted(latencies)
+    to_ms = lambda value: round(value * 1000, 2) if value is not None else None
+    return {
+        "requests": len(values) + errors,
+        "errors": errors,
+        "rps": round((len(values) + errors) / elapsed, 2) if elapsed else None,
+        "p50_ms": to_ms(percentile(values, 50)),
+        "p95_ms": to_ms(percentile(values, 95)),
+        "p99_ms": to_ms(percentile(values, 99)),
+        "max_ms": to_ms(values[-1] if values else None),
+    }
+
+
+class LoadRunner:
+    def __init__(self, base_url: str, corpus: List[Tuple[str, bytes]],
+                 weights: Dict[str, int], batch_size: int, seed: int):
+        self.base_url = base_url
+        self.corpus = corpus
+        self.kinds = [kind for kind, weight in weights.items() if weight > 0]
+        self.weights = [weights[kind] for kind in self.kinds]
+        self.batch_size = batch_size
+        self.rng = random.Random(seed)
+        self.file_ids: List[str] = []
+        self.results: Dict[str, List[float]] = {kind: [] for kind in self.kinds}
+        self.errors: Dict[str, int] = {kind: 0 for kind in self.kinds}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def session(self) -> requests.Session:
+        if not hasattr(self.local, "session"):
+            self.local.session = requests.Session()
+        return self.local.session
+
+    def pick(self) -> Tuple[str, Any]:
+        with self.lock:
+            kind = self.rng.choices(self.kinds, weights=self.weights)[0]
+            if kind == "fetch" and not self.file_ids:
+                kind = "upload"
+            if kind == "fetch":
+                return kind, self.rng.choice(self.file_ids)
+            if kind == "multiple":
+                return kind, self.rng.sample(self.corpus, min(self.batch_size, len(self.corpus)))
+            return kind, self.rng.choice(self.corpus)
+
+    def send(self, kind: str, payload: Any) -> requests.Response:
+        session = self.session()
+        api = f"{self.base_url}/api/v1"
+        if kind == "upload":
+            name, data = payload
+            return session.post(f"{api}/upload", params={"user_id": USER_ID},
+                                files={"file": (name, data)}, timeout=300)
+        if kind == "multiple":
+            files = [("files", (name, data)) for name, data in payload]
+            return session.post(f"{api}/multiple_uploads", data={"user_id": USER_ID},
+                                files=files, timeout=300)
+        return session.get(f"{api}/processed/{USER_ID}/{payload}", timeout=300)
+
+    def record_file_ids(self, kind: str, body: Any):
+        """
+        Remember returned file ids for later fetches. /multiple_uploads answers
+        200 with per-file {"error": ...} entries, so any failed file fails the
+        whole request.
+        """
+        if kind == "upload":
+            found = [body["file_info"]["file_id"]]
+        elif kind == "multiple":
+            found = [item["file_info"]["file_id"] for item in body.values() if "file_info" in item]
+        else:
+            return
+        with self.lock:
+            self.file_ids.extend(found)
+
+        if kind == "multiple":
+            failed = [name for name, item in body.items() if "error" in item]
+            if failed:
+                raise ValueError(f"{len(failed)} of {len(body)} files failed: {', '.join(failed)}")
+
+    def one_request(self, _=None):
+        kind, payload = self.pick()
+        started = time.perf_counter()
+        try:
+            response = self.send(kind, payload)
+            elapsed = time.perf_counter() - started
+            response.raise_for_status()
+            self.record_file_ids(kind, response.json())
+        except (requests.RequestException, ValueError, KeyError):
+            with self.lock:
+                self.errors[kind] += 1
+            return
+        with self.lock:
+            self.results[kind].append(elapsed)
+
+    def warm_up(self, count: int):
+        """Seed fetchable file ids and let the server reach steady state"""
+        for name, data in self.corpus[:count]:
+            response = self.send("upload", (name, data))
+            response.raise_for_status()
+            self.record_file_ids("upload", response.json())
+
+    def run(self, total_requests: int, concurrency: int) -> float:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(self.one_request, range(total_requests)))
+        return time.perf_counter() - started
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500, help="Total requests to send")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent client threads")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--mix", default="upload=5,multiple=1,fetch=4",
+                        help="Request weights, e.g. 'upload=5,multiple=1,fetch=4'")
+    parser.add_argument("--sizes", default="50,500,5000",
+                        help="Comma-separated segment counts for generated transcripts")
+    parser.add_argument("--batch-size", type=int, default=3,
+                        help="Files per /multiple_uploads request")
+    parser.add_argument("--warmup", type=int, default=4, help="Uploads sent before measuring")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--base-url", help="Target an already running server instead of starting one")
+    parser.add_argument("--output", default="loadtest_results.json",
+                        help="File the results are written to")
+    args = parser.parse_args(argv)
+
+    weights = parse_mix(args.mix)
+    sizes = [int(size) for size in args.sizes.split(",")]
+    corpus = build_corpus(sizes, args.seed)
+
+    server = None
+    sampler = None
+    workdir = None
+    base_url = args.base_url
+    try:
+        if base_url is None:
+            workdir = tempfile.mkdtemp(prefix="loadtest_")
+            base_url = f"http://127.0.0.1:{free_port()}"
+            server = start_server(int(base_url.rsplit(":", 1)[1]), args.workers, workdir)
+            wait_for_server(base_url, server)
+            sampler = RssSampler(server.pid)
+            sampler.start()
+
+        runner = LoadRunner(base_url, corpus, weights, args.batch_size, args.seed)
+        runner.warm_up(min(args.warmup, len(corpus)))
+        print(f"Sending {args.requests} requests at concurrency {args.concurrency} to {base_url}")
+        elapsed = runner.run(args.requests, args.concurrency)
+    finally:
+        if sampler:
+            sampler.stop()
+        if server:
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    all_latencies = [value for values in runner.results.values() for value in values]
+    report = {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "workers": args.workers if server else None,
+            "mix": weights,
+            "sizes": sizes,
+            "batch_size": args.batch_size,
+            "base_url": base_url,
+        },
+        "duration_s": round(elapsed, 3),
+        "overall": summarize(all_latencies, sum(runner.errors.values()), elapsed),
+        "endpoints": {
+            kind: summarize(runner.results[kind], runner.errors[kind], elapsed)
+            for kind in runner.kinds
+        },
+        "server_rss": sampler.summary() if sampler else None,
+    }
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    overall = report["overall"]
+    print(f"{overall['requests']} requests in {report['duration_s']}s "
+          f"({overall['rps']} req/s, {overall['errors']} errors)")
+    for kind, stats in report["endpoints"].items():
+        print(f"  {kind:<9} p50={stats['p50_ms']}ms p95={stats['p95_ms']}ms p99={stats['p99_ms']}ms")
+    if report["server_rss"]:
+        print(f"  server RSS peak {report['server_rss']['peak_mb']} MB")
+    print(f"Results written to {args.output}")
+    return 1 if overall["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
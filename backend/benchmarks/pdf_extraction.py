@@ -0,0 +1,156 @@
+# benchmarks/pdf_extraction.py
+"""
+Benchmark PDF transcript extraction on large generated documents.
+
+Builds transcript PDFs with the requested page counts, then times
+pdf_handler text extraction and segmentation, serial and page-parallel, and records
+segment counts, the benchmark process's peak RSS and the largest pool
+worker's peak RSS. The first run of a parallel case includes starting the
+pool, so compare best_s rather than mean_s.
+
+Usage (from the backend directory):
+    python benchmarks/pdf_extraction.py --pages 300,600,1200 --workers 1,4,8
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import time
+from typing import List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.file_handlers import pdf_handler
+
+SPEAKERS = ["Speaker 1", "Speaker 2", "Interviewer", "Guest"]
+WORDS = ["the", "project", "timeline", "we", "should", "cut", "this", "part",
+         "interview", "camera", "moment", "really", "good", "take", "again"]
+LINES_PER_PAGE = 48
+
+
+def escape_pdf_text(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def generate_transcript_pdf(page_count: int, seed: int = 1234) -> bytes:
+    """Write a minimal PDF with one Helvetica text stream per page"""
+    rng = random.Random(seed)
+    elapsed = 0
+    pages = []
+    for _ in range(page_count):
+        lines = []
+        while len(lines) < LINES_PER_PAGE:
+            minutes, seconds = divmod(elapsed, 60)
+            lines.append(f"{rng.choice(SPEAKERS)}: {minutes % 60:02d}:{seconds:02d}")
+            for _ in range(rng.randint(1, 3)):
+                lines.append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 12))))
+            elapsed += rng.randint(5, 40)
+        commands = ["BT", "/F1 10 Tf", "12 TL", "50 780 Td"]
+        commands.extend(f"({escape_pdf_text(line)}) Tj T*" for line in lines[:LINES_PER_PAGE])
+        commands.append("ET")
+        pages.append("\n".join(commands).encode("latin-1"))
+
+    # Object numbers: 1 catalog, 2 page tree, 3 font, then a page and content stream per page
+    objects = {}
+    page_ids = []
+    for index, stream in enumerate(pages):
+        page_id = 4 + index * 2
+        page_ids.append(page_id)
+        objects[page_id] = (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+                            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>").encode()
+        objects[page_id + 1] = f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream"
+    objects[1] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[2] = f"<< /Type /Pages /Kids [{kids}] /Count {page_count} >>".encode()
+    objects[3] = b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for object_id in sorted(objects):
+        offsets[object_id] = len(output)
+        output += f"{object_id} 0 obj\n".encode() + objects[object_id] + b"\nendobj\n"
+    xref_offset = len(output)
+    size = max(objects) + 1
+    output += f"xref\n0 {size}\n0000000000 65535 f \n".encode()
+    for object_id in range(1, size):
+        output += f"{offsets[object_id]:010d} 00000 n \n".encode()
+    output += f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode()
+    return bytes(output)
+
+
+def peak_rss_mb() -> float:
+    """Peak RSS of this process (ru_maxrss is KiB on Linux)"""
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def worker_peak_rss_mb() -> Optional[float]:
+    """Largest peak RSS (VmHWM) among the live extraction pool workers (Linux only)"""
+    pool = pdf_handler._pool
+    if pool is None:
+        return None
+    peaks = []
+    for pid in list(pool._processes or {}):
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        peaks.append(int(line.split()[1]))
+                        break
+        except OSError:
+            continue
+    return round(max(peaks) / 1024, 1) if peaks else None
+
+
+def run_case(content: bytes, workers: int, repeat: int) -> dict:
+    timings = []
+    parsed = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        pages = pdf_handler.extract_pages(content, max_workers=workers)
+        lines = (line for page in pages for line in page.splitlines())
+        parsed = pdf_handler.build_segments(lines, default_speaker=pdf_handler.DEFAULT_SPEAKER)
+        timings.append(time.perf_counter() - started)
+    worker_rss = worker_peak_rss_mb()
+    pdf_handler.shutdown_pool()
+    return {
+        "workers": workers,
+        "best_s": round(min(timings), 3),
+        "mean_s": round(sum(timings) / len(timings), 3),
+        "segments": len(parsed),
+        "peak_rss_mb": peak_rss_mb(),
+        "worker_peak_rss_mb": worker_rss,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", default="300,600", help="Comma-separated page counts")
+    parser.add_argument("--workers", default=f"1,{pdf_handler.PDF_MAX_WORKERS}",
+                        help="Comma-separated worker counts; 1 means serial extraction")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Optional JSON file for the results")
+    args = parser.parse_args(argv)
+
+    results = []
+    for page_count in (int(value) for value in args.pages.split(",")):
+        content = generate_transcript_pdf(page_count)
+        print(f"{page_count} pages ({len(content) / 1024 / 1024:.1f} MB)")
+        for workers in (int(value) for value in args.workers.split(",")):
+            result = run_case(content, workers, args.repeat)
+            result["pages"] = page_count
+            results.append(result)
+            print(f"  workers={workers:<3} best={result['best_s']}s mean={result['mean_s']}s "
+                  f"segments={result['segments']} peak_rss={result['peak_rss_mb']}MB "
+                  f"worker_peak_rss={result['worker_peak_rss_mb'] or '-'}MB")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())